@@ -3,6 +3,7 @@ import re
 from datetime import datetime, date
 
 import configHandler
+import DuplicateHandler
 
 
 def create_database():
@@ -16,6 +17,28 @@ def create_database():
 
     cursor.execute(load_sql_file("db_schemas/vacancies.sql"))
 
+    # Базы, созданные до появления поиска дубликатов, не содержат новых колонок
+    existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(vacancies)")}
+    if 'minhash' not in existing_columns:
+        cursor.execute("ALTER TABLE vacancies ADD COLUMN minhash BLOB DEFAULT NULL")
+    if 'canonical_id' not in existing_columns:
+        cursor.execute("ALTER TABLE vacancies ADD COLUMN canonical_id INTEGER DEFAULT NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_canonical_id ON vacancies (canonical_id)")
+
+    cursor.execute(load_sql_file("db_schemas/vacancy_lsh_buckets.sql"))
+    cursor.execute(load_sql_file("db_schemas/vacancy_lsh_meta.sql"))
+
+    # Корзины зависят от dedup.num_perm и dedup.bands: при их изменении индекс надо перестроить
+    cursor.execute("SELECT key, value FROM vacancy_lsh_meta")
+    lsh_config = dict(cursor.fetchall())
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM vacancies WHERE minhash IS NOT NULL)")
+    has_signatures = cursor.fetchone()[0]
+
+    if lsh_config != current_lsh_config() and (lsh_config or has_signatures):
+        print(f"⚠️ Параметры LSH-индекса изменились ({lsh_config} -> {current_lsh_config()}), перестраиваем индекс")
+        backfill_minhash(conn, rebuild=True)
+    else:
+        save_lsh_config(cursor)
 
     conn.commit()
     return conn
@@ -273,9 +296,73 @@ def parse_location_employment(location_text):
     return location, employment_type, remote_option
 
 
+def find_canonical_vacancy(cursor, company_name, vacancy_title, skills):
+    """
+    Ищет каноническую вакансию, почти совпадающую по компании, должности и навыкам.
+    LSH-корзины дают только кандидатов (без попарного сравнения со всей базой),
+    решение о дубликате принимается по точному коэффициенту Жаккара и совпадению уровня позиции.
+    Возвращает (сигнатура, ID канонической вакансии или None).
+    Для вакансии без токенов сигнатуры нет, и поиск дубликатов не выполняется.
+    """
+    tokens = DuplicateHandler.tokenize_vacancy(company_name, vacancy_title, skills)
+    signature = DuplicateHandler.compute_minhash(tokens)
+    if signature is None:
+        return None, None
+
+    # Все кандидаты из LSH-корзин и их поля получаем одним запросом
+    buckets = DuplicateHandler.lsh_buckets(signature)
+    cursor.execute(f'''
+                   WITH query_buckets (band, bucket) AS (VALUES {', '.join(['(?, ?)'] * len(buckets))})
+                   SELECT DISTINCT v.id, v.company_name, v.vacancy_title, v.skills
+                   FROM query_buckets q
+                            JOIN vacancy_lsh_buckets b ON b.band = q.band AND b.bucket = q.bucket
+                            JOIN vacancies v ON v.id = b.vacancy_id
+                   ORDER BY v.id
+                   ''', [value for band_bucket in buckets for value in band_bucket])
+    candidates = cursor.fetchall()
+
+    grade = DuplicateHandler.extract_grade(skills)
+    best_id = None
+    best_similarity = configHandler.dedup_threshold
+    for candidate_id, candidate_company, candidate_title, candidate_skills in candidates:
+        if DuplicateHandler.extract_grade(candidate_skills) != grade:
+            continue
+
+        similarity = DuplicateHandler.jaccard_similarity(
+            tokens, DuplicateHandler.tokenize_vacancy(candidate_company, candidate_title, candidate_skills)
+        )
+        if similarity >= best_similarity:
+            best_id = candidate_id
+            best_similarity = similarity
+
+    return signature, best_id
+
+
+def current_lsh_config():
+    """Параметры LSH-индекса из application.conf"""
+    return {'num_perm': configHandler.dedup_num_perm, 'bands': configHandler.dedup_bands}
+
+
+def save_lsh_config(cursor):
+    """Запоминает параметры, с которыми построен LSH-индекс"""
+    cursor.executemany(
+        'INSERT OR REPLACE INTO vacancy_lsh_meta (key, value) VALUES (?, ?)',
+        current_lsh_config().items()
+    )
+
+
+def index_vacancy(cursor, vacancy_id, signature):
+    """Добавляет каноническую вакансию в LSH-индекс"""
+    cursor.executemany(
+        'INSERT OR IGNORE INTO vacancy_lsh_buckets (band, bucket, vacancy_id) VALUES (?, ?, ?)',
+        [(band, bucket, vacancy_id) for band, bucket in DuplicateHandler.lsh_buckets(signature)]
+    )
+
+
 def insert_vacancies(conn, data):
-    """Вставляет данные в базу"""
+    """Вставляет данные в базу, связывая почти-дубликаты с канонической вакансией"""
     cursor = conn.cursor()
+    duplicates_count = 0
 
     for item in data:
         date_posted_original = item[0]
@@ -293,21 +380,90 @@ def insert_vacancies(conn, data):
         location, employment_type, remote_option = parse_location_employment(location_text)
         salary_min, salary_max, salary_currency, parsed_salary_text, is_exact_salary = parse_salary(salary_text)
 
+        # Ищем почти-дубликат по компании, должности и навыкам
+        signature, canonical_id = find_canonical_vacancy(cursor, company_name, vacancy_title, skills)
+        # Пустой BLOB означает, что сигнатуры нет (у вакансии нет токенов)
+        minhash = DuplicateHandler.signature_to_blob(signature) if signature is not None else b''
+
         # Вставляем в базу
         cursor.execute('''
                        INSERT INTO vacancies
                        (date_posted, date_posted_timestamp, company_name, company_rating, vacancy_title, location,
                         employment_type, remote_option, salary_text, salary_min, salary_max, salary_currency,
-                        is_exact_salary, skills)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        is_exact_salary, skills, minhash, canonical_id)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                        ''', (
                            date_posted_original, date_posted_timestamp, company_name, company_rating,
                            vacancy_title, location, employment_type, remote_option, parsed_salary_text,
-                           salary_min, salary_max, salary_currency, is_exact_salary, skills
+                           salary_min, salary_max, salary_currency, is_exact_salary, skills,
+                           minhash, canonical_id
                        ))
 
+        if canonical_id is not None:
+            duplicates_count += 1
+        elif signature is not None:
+            index_vacancy(cursor, cursor.lastrowid, signature)
+
     conn.commit()
-    print(f"✅ Добавлено {len(data)} записей в базу данных")
+    print(f"✅ Добавлено {len(data)} записей в базу данных (из них дубликатов: {duplicates_count})")
+
+
+def backfill_minhash(conn, batch_size=1000, rebuild=False):
+    """
+    Вычисляет сигнатуры и кластеризует вакансии, добавленные до появления поиска дубликатов.
+    Обрабатывает записи пачками по первичному ключу, чтобы не держать всю таблицу в памяти
+    и не перечитывать уже обработанные строки.
+    При rebuild=True сбрасывает все сигнатуры, кластеры и LSH-индекс и строит их заново
+    с текущими параметрами dedup из application.conf.
+    """
+    cursor = conn.cursor()
+    processed_count = 0
+    duplicates_count = 0
+    last_id = 0
+
+    if rebuild:
+        cursor.execute('UPDATE vacancies SET minhash = NULL, canonical_id = NULL')
+        cursor.execute('DELETE FROM vacancy_lsh_buckets')
+        save_lsh_config(cursor)
+        conn.commit()
+
+    while True:
+        cursor.execute('''
+                       SELECT id, company_name, vacancy_title, skills
+                       FROM vacancies
+                       WHERE id > ?
+                         AND minhash IS NULL
+                       ORDER BY id
+                       LIMIT ?
+                       ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        for vacancy_id, company_name, vacancy_title, skills in rows:
+            signature, canonical_id = find_canonical_vacancy(cursor, company_name, vacancy_title, skills)
+
+            # Пустой BLOB отмечает вакансию без токенов как обработанную
+            minhash = DuplicateHandler.signature_to_blob(signature) if signature is not None else b''
+            cursor.execute(
+                'UPDATE vacancies SET minhash = ?, canonical_id = ? WHERE id = ?',
+                (minhash, canonical_id, vacancy_id)
+            )
+
+            if canonical_id is not None:
+                duplicates_count += 1
+            elif signature is not None:
+                index_vacancy(cursor, vacancy_id, signature)
+
+            processed_count += 1
+
+        last_id = rows[-1][0]
+        conn.commit()
+
+    if processed_count:
+        print(f"✅ Рассчитаны сигнатуры для {processed_count} записей (из них дубликатов: {duplicates_count})")
+
+    return processed_count
 
 
 def get_vacancies(conn, num):
@@ -327,6 +483,43 @@ def get_vacancies(conn, num):
     return vacancies
 
 
+def get_cluster_analysis(conn, cluster_id):
+    """
+    Возвращает готовый анализ GigaChat для любой вакансии из кластера дубликатов
+    (каноническая вакансия или её дубликаты), либо None, если кластер ещё не анализировался.
+    """
+    cursor = conn.cursor()
+
+    cursor.execute('''
+                   SELECT match_score, is_relevant, missing_skills, redundant_skills, analysis, recommendations
+                   FROM vacancies
+                   WHERE (id = ? OR canonical_id = ?)
+                     AND match_score IS NOT NULL
+                   LIMIT 1
+                   ''', (cluster_id, cluster_id))
+
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    import json
+
+    def load_list(value):
+        try:
+            return json.loads(value) if value else []
+        except json.JSONDecodeError:
+            return value
+
+    return {
+        'match_score': row[0],
+        'is_relevant': row[1],
+        'missing_skills': load_list(row[2]),
+        'redundant_skills': load_list(row[3]),
+        'analysis': row[4] or '',
+        'recommendations': load_list(row[5]),
+    }
+
+
 def update_vacancies(conn, vacancies):
     """
     Обновляет вакансии в базе данных с результатами анализа GigaChat.
@@ -0,0 +1,129 @@
+import hashlib
+import random
+import re
+import struct
+
+import configHandler
+
+# Простое число Мерсенна 2^61 - 1 для универсального хеширования
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+if configHandler.dedup_num_perm % configHandler.dedup_bands != 0:
+    raise ValueError(
+        f"dedup.num_perm ({configHandler.dedup_num_perm}) должно делиться "
+        f"на dedup.bands ({configHandler.dedup_bands}) без остатка"
+    )
+
+# Уровень позиции в начале списка навыков, например "Младший (Junior)"
+GRADE_PATTERN = re.compile(r'\((intern|junior|middle|senior|lead)\)', re.IGNORECASE)
+
+# Фиксированный seed: сигнатуры хранятся в базе и должны совпадать между запусками
+_rng = random.Random(42)
+_PERMUTATIONS = [
+    (_rng.randint(1, MERSENNE_PRIME - 1), _rng.randint(0, MERSENNE_PRIME - 1))
+    for _ in range(configHandler.dedup_num_perm)
+]
+
+
+def tokenize_vacancy(company_name, vacancy_title, skills):
+    """
+    Разбивает компанию, должность и навыки вакансии на множество токенов.
+    Навыки берутся целиком (разделители "•" и ","), поэтому порядок навыков не важен.
+    """
+    tokens = set()
+
+    if company_name:
+        tokens.add('c:' + company_name.strip().lower())
+
+    if vacancy_title:
+        for word in re.findall(r'[\w+#]+', vacancy_title.lower()):
+            tokens.add('t:' + word)
+
+    if skills:
+        for skill in re.split(r'[•,;\n]', skills.lower()):
+            skill = ' '.join(skill.split())
+            if skill:
+                tokens.add('s:' + skill)
+
+    return tokens
+
+
+def extract_grade(skills):
+    """Возвращает уровень позиции из строки навыков ("junior", "middle", ...) или None"""
+    if not skills:
+        return None
+
+    match = GRADE_PATTERN.search(skills)
+    return match.group(1).lower() if match else None
+
+
+def jaccard_similarity(tokens_a, tokens_b):
+    """Точный коэффициент Жаккара двух множеств токенов"""
+    if not tokens_a or not tokens_b:
+        return 0.0
+
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def compute_minhash(tokens):
+    """
+    Вычисляет MinHash-сигнатуру множества токенов.
+    Для пустого множества возвращает None: такие вакансии не с чем сравнивать.
+    """
+    if not tokens:
+        return None
+
+    signature = [MAX_HASH] * len(_PERMUTATIONS)
+
+    for token in tokens:
+        token_hash = int.from_bytes(
+            hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little'
+        )
+        for i, (a, b) in enumerate(_PERMUTATIONS):
+            value = ((a * token_hash + b) % MERSENNE_PRIME) & MAX_HASH
+            if value < signature[i]:
+                signature[i] = value
+
+    return signature
+
+
+def signature_to_blob(signature):
+    """Упаковывает сигнатуру в BLOB для хранения в базе"""
+    return struct.pack(f'<{len(signature)}I', *signature)
+
+
+def blob_to_signature(blob):
+    """
+    Распаковывает сигнатуру из BLOB (пустой BLOB хранится у вакансий без токенов и сюда не передаётся).
+    Сигнатура другой длины означает, что она посчитана с другим dedup.num_perm.
+    """
+    if len(blob) != 4 * configHandler.dedup_num_perm:
+        raise ValueError(
+            f"Длина сигнатуры ({len(blob) // 4}) не совпадает с dedup.num_perm "
+            f"({configHandler.dedup_num_perm}), пересчитайте их через DBhandler.backfill_minhash(conn, rebuild=True)"
+        )
+
+    return list(struct.unpack(f'<{configHandler.dedup_num_perm}I', blob))
+
+
+def lsh_buckets(signature):
+    """
+    Разбивает сигнатуру на полосы (bands) и возвращает список (номер полосы, корзина).
+    Вакансии, совпавшие хотя бы в одной корзине, считаются кандидатами в дубликаты.
+    """
+    if len(signature) != configHandler.dedup_num_perm:
+        raise ValueError(
+            f"Длина сигнатуры ({len(signature)}) не совпадает с dedup.num_perm ({configHandler.dedup_num_perm})"
+        )
+
+    rows = len(signature) // configHandler.dedup_bands
+    buckets = []
+
+    for band in range(configHandler.dedup_bands):
+        band_values = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(struct.pack(f'<{rows}I', *band_values), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+
+    return buckets
+
@@ -90,9 +90,29 @@ def validate_skills_for_vacancy(vacancy_title, skills):
     return response.json()
 
 
-def gigachat_analyse(vacancies):
+def gigachat_analyse(vacancies, conn=None):
+    """
+    Анализирует вакансии через GigaChat.
+    Для почти-дубликатов повторно использует анализ канонической вакансии:
+    сначала из текущей пачки, затем (если передано соединение) из базы.
+    """
     vacancies_after_analyse = list()
+    cluster_analyses = dict()
     for vacancy in vacancies:
+        cluster_id = vacancy.get('canonical_id') or vacancy.get('id')
+
+        if cluster_id is not None and cluster_id not in cluster_analyses and conn is not None:
+            cluster_analysis = DBhandler.get_cluster_analysis(conn, cluster_id)
+            if cluster_analysis is not None:
+                cluster_analyses[cluster_id] = cluster_analysis
+
+        if cluster_id in cluster_analyses:
+            print(f"♻️ Вакансия ID {vacancy.get('id')} — дубликат, используем анализ вакансии ID {cluster_id}")
+            result = vacancy.copy()
+            result.update(cluster_analyses[cluster_id])
+            vacancies_after_analyse.append(result)
+            continue
+
         # Получаем ответ от GigaChat
         response = validate_skills_for_vacancy(vacancy['company_name'], vacancy['skills'])
 
@@ -137,6 +157,11 @@ def gigachat_analyse(vacancies):
             result['recommendations'] = analysis_data.get('recommendations', [])
 
             vacancies_after_analyse.append(result)
+            if cluster_id is not None:
+                cluster_analyses[cluster_id] = {
+                    key: result[key] for key in
+                    ('match_score', 'is_relevant', 'missing_skills', 'redundant_skills', 'analysis', 'recommendations')
+                }
 
         except json.JSONDecodeError as e:
             print(f"Ошибка при парсинге JSON: {e}")
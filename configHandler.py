@@ -26,4 +26,8 @@ if config:
     api_key = config.get('api.gigachat.client_id')
     num_of_vacancies_to_analyse = config.get('api.gigachat.num_of_vacancies_to_analyse')
 
-    db_name = config.get('database.name')
\ No newline at end of file
+    db_name = config.get('database.name')
+
+    dedup_num_perm = config.get('dedup.num_perm')
+    dedup_bands = config.get('dedup.bands')
+    dedup_threshold = config.get('dedup.threshold')
\ No newline at end of file
@@ -27,5 +27,9 @@ CREATE TABLE IF NOT EXISTS vacancies
     analysis              TEXT      DEFAULT NULL,
     recommendations       TEXT      DEFAULT NULL,
 
+    --Поля для поиска дубликатов
+    minhash               BLOB      DEFAULT NULL, -- MinHash-сигнатура компании, должности и навыков
+    canonical_id          INTEGER   DEFAULT NULL, -- ID исходной вакансии, если эта является её дубликатом
+
     scraped_date          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -0,0 +1,9 @@
+-- LSH-индекс по MinHash-сигнатурам. Хранятся только канонические вакансии,
+-- поэтому размер корзины не растёт с числом копий одной и той же вакансии.
+CREATE TABLE IF NOT EXISTS vacancy_lsh_buckets
+(
+    band       INTEGER NOT NULL,
+    bucket     INTEGER NOT NULL,
+    vacancy_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, vacancy_id)
+) WITHOUT ROWID;
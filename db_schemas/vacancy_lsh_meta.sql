@@ -0,0 +1,7 @@
+-- Параметры (dedup.num_perm, dedup.bands), с которыми построен LSH-индекс.
+-- При их изменении сохранённые корзины больше не совпадают с новыми и индекс перестраивается.
+CREATE TABLE IF NOT EXISTS vacancy_lsh_meta
+(
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
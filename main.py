@@ -9,6 +9,7 @@ def main():
 
     # driver = WebScrapper.get_driver()
     conn = DBhandler.create_database()
+    DBhandler.backfill_minhash(conn)
 
     # for page_num in range(1, MAX_PAGES + 1):
     #     driver.get(f"https://career.habr.com/vacancies?page={page_num}type=all")
@@ -16,7 +17,7 @@ def main():
     #     DBhandler.insert_vacancies(conn, vacancies)
 
     vacancies = DBhandler.get_vacancies(conn, configHandler.num_of_vacancies_to_analyse)
-    vacancies_after_analyse = GigaChatHandler.gigachat_analyse(vacancies)
+    vacancies_after_analyse = GigaChatHandler.gigachat_analyse(vacancies, conn)
 
     DBhandler.update_vacancies(conn, vacancies_after_analyse)
 if __name__ == "__main__":
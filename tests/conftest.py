@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модули проекта лежат в корне репозитория и читают application.conf относительно текущей папки
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)
@@ -0,0 +1,133 @@
+import pytest
+
+import configHandler
+import DBhandler
+import DuplicateHandler
+import GigaChatHandler
+
+SKILLS = 'Бэкенд разработчик, Старший (Senior) • Golang • Apache Kafka • PostgreSQL'
+
+
+def make_vacancy(date='3 декабря', company='Магнит\n4.5', title='Golang разработчик (Команда AdTech)',
+                 location='Москва • Полный рабочий день', salary='', skills=SKILLS):
+    return date, company, title, location, salary, skills
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(configHandler, 'db_name', str(tmp_path / 'vacancies.db'))
+    conn = DBhandler.create_database()
+    yield conn
+    conn.close()
+
+
+def canonical_ids(conn):
+    return [row[0] for row in conn.execute('SELECT canonical_id FROM vacancies ORDER BY id')]
+
+
+def test_reordered_skills_new_location_and_date_are_duplicates(conn):
+    DBhandler.insert_vacancies(conn, [
+        make_vacancy(),
+        make_vacancy(
+            date='5 декабря',
+            location='Санкт-Петербург • Казань • Полный рабочий день • Можно удаленно',
+            skills='PostgreSQL • Golang • Apache Kafka • Бэкенд разработчик, Старший (Senior)',
+        ),
+    ])
+
+    assert canonical_ids(conn) == [None, 1]
+
+
+def test_different_grade_is_not_duplicate(conn):
+    DBhandler.insert_vacancies(conn, [
+        make_vacancy(),
+        make_vacancy(skills=SKILLS.replace('Старший (Senior)', 'Средний (Middle)')),
+    ])
+
+    assert canonical_ids(conn) == [None, None]
+
+
+def test_different_title_is_not_duplicate(conn):
+    DBhandler.insert_vacancies(conn, [
+        make_vacancy(),
+        make_vacancy(title='Golang разработчик (команда Video)'),
+    ])
+
+    assert canonical_ids(conn) == [None, None]
+
+
+def test_empty_vacancies_are_not_clustered(conn):
+    DBhandler.insert_vacancies(conn, [
+        (None, None, None, None, None, None),
+        (None, None, None, None, None, None),
+    ])
+
+    assert canonical_ids(conn) == [None, None]
+    assert conn.execute('SELECT COUNT(*) FROM vacancy_lsh_buckets').fetchone()[0] == 0
+
+
+def test_backfill_marks_empty_vacancies_as_processed(conn):
+    DBhandler.insert_vacancies(conn, [(None, None, None, None, None, None), make_vacancy()])
+    conn.execute('UPDATE vacancies SET minhash = NULL, canonical_id = NULL')
+    conn.execute('DELETE FROM vacancy_lsh_buckets')
+
+    assert DBhandler.backfill_minhash(conn) == 2
+    assert DBhandler.backfill_minhash(conn) == 0
+
+
+def test_backfill_clusters_existing_rows(conn):
+    DBhandler.insert_vacancies(conn, [make_vacancy(), make_vacancy(date='5 декабря')])
+    conn.execute('UPDATE vacancies SET minhash = NULL, canonical_id = NULL')
+    conn.execute('DELETE FROM vacancy_lsh_buckets')
+
+    assert DBhandler.backfill_minhash(conn, batch_size=1) == 2
+    assert canonical_ids(conn) == [None, 1]
+
+
+def test_gigachat_analyse_reuses_cluster_analysis(conn, monkeypatch):
+    calls = []
+
+    def fake_validate(vacancy_title, skills):
+        calls.append(vacancy_title)
+        content = '{"match_score": 80, "is_relevant": true, "missing_skills": ["Docker"], ' \
+                  '"redundant_skills": [], "analysis": "ok", "recommendations": []}'
+        return {'choices': [{'message': {'content': content}}]}
+
+    monkeypatch.setattr(GigaChatHandler, 'validate_skills_for_vacancy', fake_validate)
+
+    DBhandler.insert_vacancies(conn, [make_vacancy(), make_vacancy(date='5 декабря'), make_vacancy(date='6 декабря')])
+
+    # Каноническая вакансия и её дубликат в одной пачке: GigaChat вызывается один раз
+    analysed = GigaChatHandler.gigachat_analyse(DBhandler.get_vacancies(conn, 2), conn)
+    assert len(calls) == 1
+    assert [vacancy['match_score'] for vacancy in analysed] == [80, 80]
+    DBhandler.update_vacancies(conn, analysed)
+
+    # Оставшийся дубликат получает анализ из базы без обращения к GigaChat
+    analysed = GigaChatHandler.gigachat_analyse(DBhandler.get_vacancies(conn, 10), conn)
+    assert len(calls) == 1
+    assert analysed[0]['id'] == 3
+    assert analysed[0]['missing_skills'] == ['Docker']
+
+
+def test_rebuild_reclusters_all_rows(conn):
+    DBhandler.insert_vacancies(conn, [make_vacancy(), make_vacancy(date='5 декабря')])
+
+    assert DBhandler.backfill_minhash(conn, rebuild=True) == 2
+    assert canonical_ids(conn) == [None, 1]
+
+
+@pytest.mark.parametrize('setting, value', [('dedup_bands', 32), ('dedup_num_perm', 64)])
+def test_changed_lsh_config_rebuilds_index(conn, monkeypatch, setting, value):
+    DBhandler.insert_vacancies(conn, [make_vacancy()])
+    conn.close()
+
+    monkeypatch.setattr(configHandler, setting, value)
+    if setting == 'dedup_num_perm':
+        monkeypatch.setattr(DuplicateHandler, '_PERMUTATIONS', DuplicateHandler._PERMUTATIONS[:value])
+    conn = DBhandler.create_database()
+
+    assert dict(conn.execute('SELECT key, value FROM vacancy_lsh_meta')) == DBhandler.current_lsh_config()
+    DBhandler.insert_vacancies(conn, [make_vacancy(date='5 декабря')])
+    assert canonical_ids(conn) == [None, 1]
+    conn.close()
@@ -0,0 +1,69 @@
+import pytest
+
+import configHandler
+import DuplicateHandler
+
+COMPANY = 'Магнит'
+TITLE = 'Golang разработчик (Команда AdTech)'
+SKILLS = 'Бэкенд разработчик, Старший (Senior) • Golang • Apache Kafka • PostgreSQL'
+
+
+def test_reordered_skills_give_same_tokens_and_signature():
+    reordered = 'PostgreSQL • Apache Kafka • Golang • Бэкенд разработчик, Старший (Senior)'
+
+    tokens = DuplicateHandler.tokenize_vacancy(COMPANY, TITLE, SKILLS)
+    reordered_tokens = DuplicateHandler.tokenize_vacancy(COMPANY, TITLE, reordered)
+
+    assert tokens == reordered_tokens
+    assert DuplicateHandler.compute_minhash(tokens) == DuplicateHandler.compute_minhash(reordered_tokens)
+
+
+def test_different_title_is_not_duplicate():
+    tokens = DuplicateHandler.tokenize_vacancy(COMPANY, TITLE, SKILLS)
+    other_tokens = DuplicateHandler.tokenize_vacancy(COMPANY, 'Golang разработчик (команда Video)', SKILLS)
+
+    assert DuplicateHandler.jaccard_similarity(tokens, other_tokens) < configHandler.dedup_threshold
+
+
+def test_jaccard_similarity():
+    assert DuplicateHandler.jaccard_similarity({'a', 'b'}, {'a', 'b'}) == 1.0
+    assert DuplicateHandler.jaccard_similarity({'a', 'b'}, {'b', 'c'}) == pytest.approx(1 / 3)
+    assert DuplicateHandler.jaccard_similarity(set(), set()) == 0.0
+
+
+def test_extract_grade():
+    assert DuplicateHandler.extract_grade(SKILLS) == 'senior'
+    assert DuplicateHandler.extract_grade('Системный аналитик, Младший (Junior) • SQL') == 'junior'
+    assert DuplicateHandler.extract_grade('DevOps-инженер • DevOps') is None
+    assert DuplicateHandler.extract_grade(None) is None
+
+
+def test_empty_tokens_have_no_signature():
+    tokens = DuplicateHandler.tokenize_vacancy(None, None, None)
+
+    assert tokens == set()
+    assert DuplicateHandler.compute_minhash(tokens) is None
+
+
+def test_signature_blob_roundtrip():
+    signature = DuplicateHandler.compute_minhash(DuplicateHandler.tokenize_vacancy(COMPANY, TITLE, SKILLS))
+
+    assert len(signature) == configHandler.dedup_num_perm
+    assert DuplicateHandler.blob_to_signature(DuplicateHandler.signature_to_blob(signature)) == signature
+
+
+def test_blob_of_wrong_length_raises():
+    with pytest.raises(ValueError):
+        DuplicateHandler.blob_to_signature(DuplicateHandler.signature_to_blob([1, 2, 3]))
+
+
+def test_lsh_buckets():
+    signature = DuplicateHandler.compute_minhash(DuplicateHandler.tokenize_vacancy(COMPANY, TITLE, SKILLS))
+
+    buckets = DuplicateHandler.lsh_buckets(signature)
+
+    assert [band for band, _ in buckets] == list(range(configHandler.dedup_bands))
+    assert buckets == DuplicateHandler.lsh_buckets(list(signature))
+
+    with pytest.raises(ValueError):
+        DuplicateHandler.lsh_buckets(signature[:-1])